@@ -6,7 +6,9 @@ import psutil
 
 
 @pytest.mark.parametrize('as_json,expected_result', [
-    (True, '{\n    "31": false, \n    "1": 3\n}'),
+    pytest.param(True, '{\n    "31": false, \n    "1": 3\n}',
+                 marks=pytest.mark.xfail(raises=TypeError,
+                                         reason="json can't sort mixed keys")),
     (False, "{31: False, '1': 3}"),
 ])
 def test_print_dict(as_json, expected_result):
@@ -15,6 +17,28 @@ def test_print_dict(as_json, expected_result):
     assert vcmmd.util.misc.print_dict(input_dict, j=as_json) == expected_result
 
 
+def test_print_dict_json():
+    input_dict = {'31': False, '1': 3}
+
+    assert vcmmd.util.misc.print_dict(input_dict, j=True) == \
+        '{\n    "1": 3,\n    "31": false\n}'
+
+
+@pytest.mark.parametrize('v,t,expected_result', [
+    (0, 4096, 0),
+    (1, 4096, 4096),
+    (4096, 4096, 4096),
+    (4097, 4096, 8192),
+    (7, 1, 7),
+    (0, 3, 0),
+    (7, 3, 9),
+    (9, 3, 9),
+    (130 << 20, 128 << 20, 256 << 20),
+])
+def test_roundup(v, t, expected_result):
+    assert vcmmd.util.misc.roundup(v, t) == expected_result
+
+
 @pytest.mark.parametrize('input,expected_result', [
     ('1-9', [1, 2, 3, 4, 5, 6, 7, 8, 9]),
     ('0-1', [0, 1]),
@@ -29,7 +53,7 @@ def test_parse_range_ok(input, expected_result):
     assert vcmmd.util.misc.parse_range(input) == expected_result
 
 
-@pytest.mark.parametrize('input', ['-1-9', '2-', '1-2-3', '-'])
+@pytest.mark.parametrize('input', ['-1-9', '2-', '1-2-3', '-', '1 2', 'a-3'])
 def test_parse_range_bad_input(input):
     with pytest.raises(ValueError):
         vcmmd.util.misc.parse_range(input)
@@ -39,12 +63,28 @@ def test_parse_range_bad_input(input):
     ('1-2,5-9', [1, 2, 5, 6, 7, 8, 9]),
     ('0,1,2,3', [0, 1, 2, 3]),
     ('9-11,12-10,2901', [9, 10, 11, 12, 2901]),
+    ('3,1-4,2-6,5', [1, 2, 3, 4, 5, 6]),
     ('', []),
 ])
 def test_parse_range_list_ok(input, expected_result):
     assert vcmmd.util.misc.parse_range_list(input) == expected_result
 
 
+def test_parse_cpu_stats():
+    lines = [
+        'cpu  10 20 30 40 50 0 0 0 0 0\n',
+        'cpu0 1 2 3 4 5 0 0 0 0 0\n',
+        'cpu12 6 7 8 9 10 0 0 0 0 0\n',
+        'intr 100 0 0\n',
+        'ctxt 123\n',
+        '\n',
+    ]
+    assert vcmmd.util.misc.parse_cpu_stats(lines) == {
+        0: {'cpuuser': 1, 'cpunice': 2, 'cpusystem': 3, 'cpuidle': 4},
+        12: {'cpuuser': 6, 'cpunice': 7, 'cpusystem': 8, 'cpuidle': 9},
+    }
+
+
 @mock.patch('psutil.process_iter')
 def test_get_cs_num_no_cs_processes(mock_process_iter):
     mock_process_iter.return_value = [mock.MagicMock(), mock.MagicMock()]
@@ -89,3 +129,72 @@ def test_get_cs_num_psutil_no_cmdline(mock_process_iter):
     cs_num = vcmmd.util.misc.get_cs_num()
 
     assert cs_num == 1
+
+
+def _mock_qemu_process(pid, cmdline, create_time=0, name='qemu-kvm'):
+    proc = mock.MagicMock()
+    proc.pid = pid
+    proc.info = {'name': name}
+    proc.cmdline = mock.MagicMock(return_value=cmdline)
+    proc.create_time = mock.MagicMock(return_value=create_time)
+    return proc
+
+
+@mock.patch.dict('vcmmd.util.misc._qemu_machine_pids', clear=True)
+@mock.patch('psutil.process_iter')
+def test_lookup_qemu_machine_pid(mock_process_iter):
+    mock_process_iter.return_value = [
+        _mock_qemu_process(1, ['/usr/bin/bash'], name='bash'),
+        _mock_qemu_process(2, ['/usr/libexec/qemu-kvm', '-name', 'guest=other,debug-threads=on']),
+        _mock_qemu_process(3, ['/usr/libexec/qemu-kvm', '-name', 'guest=vm1,debug-threads=on']),
+    ]
+
+    assert vcmmd.util.misc.lookup_qemu_machine_pid('vm1') == 3
+    mock_process_iter.return_value[0].cmdline.assert_not_called()
+
+
+@mock.patch.dict('vcmmd.util.misc._qemu_machine_pids', clear=True)
+@mock.patch('psutil.process_iter')
+def test_lookup_qemu_machine_pid_newest(mock_process_iter):
+    mock_process_iter.return_value = [
+        _mock_qemu_process(2, ['/usr/libexec/qemu-kvm', '-name', 'guest=vm1'], create_time=1),
+        _mock_qemu_process(3, ['/usr/libexec/qemu-kvm', '-name', 'guest=vm1'], create_time=2),
+    ]
+
+    assert vcmmd.util.misc.lookup_qemu_machine_pid('vm1') == 3
+
+
+@mock.patch.dict('vcmmd.util.misc._qemu_machine_pids', clear=True)
+@mock.patch('psutil.process_iter')
+def test_lookup_qemu_machine_pid_not_found(mock_process_iter):
+    pr1 = _mock_qemu_process(2, ['/usr/libexec/qemu-kvm', '-name', 'guest=vm1'])
+    pr1.cmdline.side_effect = psutil.NoSuchProcess(2, msg='fake_error')
+    mock_process_iter.return_value = [pr1]
+
+    with pytest.raises(OSError):
+        vcmmd.util.misc.lookup_qemu_machine_pid('vm1')
+
+
+@mock.patch.dict('vcmmd.util.misc._qemu_machine_pids', clear=True)
+@mock.patch('psutil.Process')
+@mock.patch('psutil.process_iter')
+def test_lookup_qemu_machine_pid_cached(mock_process_iter, mock_process):
+    mock_process_iter.return_value = [
+        _mock_qemu_process(3, ['/usr/libexec/qemu-kvm', '-name', 'guest=vm1'], create_time=5),
+    ]
+    mock_process.return_value.create_time.return_value = 5
+
+    assert vcmmd.util.misc.lookup_qemu_machine_pid('vm1') == 3
+    assert vcmmd.util.misc.lookup_qemu_machine_pid('vm1') == 3
+    assert mock_process_iter.call_count == 1
+    mock_process.assert_called_with(3)
+
+    # PID reused by another process
+    mock_process.return_value.create_time.return_value = 6
+    assert vcmmd.util.misc.lookup_qemu_machine_pid('vm1') == 3
+    assert mock_process_iter.call_count == 2
+
+    vcmmd.util.misc.forget_qemu_machine_pid('vm1')
+    mock_process_iter.return_value = []
+    with pytest.raises(OSError):
+        vcmmd.util.misc.lookup_qemu_machine_pid('vm1')
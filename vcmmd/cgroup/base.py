@@ -19,7 +19,7 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
-import os.path
+import os
 
 
 class Cgroup:
@@ -45,8 +45,13 @@ class Cgroup:
             return f.read()
 
     def _write_file_str(self, filename, val):
-        with open(self._file_path(filename), 'w') as f:
-            f.write(val)
+        # Knobs take a single short value, there is no point in going through
+        # a buffered text file for it.
+        fd = os.open(self._file_path(filename), os.O_WRONLY)
+        try:
+            os.write(fd, val.encode())
+        finally:
+            os.close(fd)
 
     def _read_file_int(self, filename):
         return int(self._read_file_str(filename))
@@ -19,10 +19,10 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
-import re
 import pydbus
 
 from vcmmd.cgroup.base import Cgroup
+from vcmmd.util.misc import parse_cpu_stats
 
 
 class CpuCgroup(Cgroup):
@@ -30,19 +30,7 @@ class CpuCgroup(Cgroup):
     CONTROLLER = 'cpu'
 
     def get_cpu_stats(self):
-        names = ["cpuuser", "cpunice", "cpusystem", "cpuidle"]
-        stats = self._read_file_str("proc.stat")
-        res = {}
-        for line in stats.splitlines():
-            if not re.search("cpu\d+", line):
-                continue
-            cpu, data = re.split(" ", line, maxsplit = 1)
-            cpu = int(cpu[3:])
-            for name, value in zip(names, re.findall("(\d+)", data)):
-                if cpu not in res:
-                    res[cpu] = {}
-                res[cpu][name] = int(value)
-        return res
+        return parse_cpu_stats(self._read_file_str("proc.stat").splitlines())
 
     def get_nr_cpus(self):
         return self._read_file_int("nr_cpus")
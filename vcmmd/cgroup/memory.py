@@ -19,8 +19,6 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
-import re
-
 from vcmmd.cgroup.base import Cgroup
 from vcmmd.util.limits import INT64_MAX
 from vcmmd.util.limits import PAGE_SIZE
@@ -110,16 +108,20 @@ class MemoryCgroup(Cgroup):
     def get_numa_stats(self):
         stats = self._read_file_str("numa_stat")
         res = {}
-        for line in stats.split("\n"):
-            if not line:
+        # Lines look like "total=<pages> N0=<pages> N1=<pages> ..."
+        for line in stats.splitlines():
+            fields = line.split()
+            if not fields:
                 continue
-            name, data = re.split(" ", line, maxsplit = 1)
-            name = "mem" + name.split("=")[0]
-            for node, value in re.findall("N(\d+)=(\d+)", data):
-                node, value = int(node), int(value)
+            name = "mem" + fields[0].partition("=")[0]
+            for field in fields[1:]:
+                node, _, value = field.partition("=")
+                if node[:1] != "N" or not node[1:].isdigit():
+                    continue
+                node = int(node[1:])
                 if node not in res:
                     res[node] = {}
-                res[node][name] = value * PAGE_SIZE
+                res[node][name] = int(value) * PAGE_SIZE
         return res
 
     def set_node_list(self, nodes):
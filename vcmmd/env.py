@@ -19,10 +19,20 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
+import functools
 import logging
 from abc import ABCMeta, abstractmethod
 
 
+# logging.getLogger() takes the logging module lock on every call, while
+# all VEs share the same logger.
+_get_logger = functools.lru_cache()(logging.getLogger)
+
+_DEBUG = logging.DEBUG
+_INFO = logging.INFO
+_ERROR = logging.ERROR
+
+
 class Env(metaclass=ABCMeta):
     @abstractmethod
     def update_stats(self):
@@ -37,19 +47,23 @@ class Env(metaclass=ABCMeta):
         pass
 
     def __init__(self, name):
-        self.__logger = logging.getLogger(name)
+        self.__logger = _get_logger(name)
 
     def __log(self, lvl, msg, *args, **kwargs):
-        self.__logger.log(lvl, str(self) + ': ' + msg, *args, **kwargs)
+        # Check the level first and let logging format the prefix, so that
+        # nothing is formatted for messages that are going to be dropped.
+        if not self.__logger.isEnabledFor(lvl):
+            return
+        if args:
+            self.__logger.log(lvl, '%s: ' + msg, self, *args, **kwargs)
+        else:
+            self.__logger.log(lvl, '%s: %s', self, msg, **kwargs)
 
     def log_err(self, *args, **kwargs):
-        self.__log(logging.ERROR, *args, **kwargs)
+        self.__log(_ERROR, *args, **kwargs)
 
     def log_info(self, *args, **kwargs):
-        self.__log(logging.INFO, *args, **kwargs)
+        self.__log(_INFO, *args, **kwargs)
 
     def log_debug(self, *args, **kwargs):
-        # Debugging is unlikely to be enabled.
-        # Avoid evaluating args if it is not.
-        if self.__logger.isEnabledFor(logging.DEBUG):
-            self.__log(logging.DEBUG, *args, **kwargs)
+        self.__log(_DEBUG, *args, **kwargs)
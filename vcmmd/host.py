@@ -21,14 +21,13 @@
 
 import os
 import psutil
-import re
 import socket
 from abc import ABCMeta
 import multiprocessing
 
 from vcmmd.util.singleton import Singleton
 from vcmmd.util.stats import Stats
-from vcmmd.util.misc import clamp
+from vcmmd.util.misc import clamp, parse_cpu_stats
 from vcmmd.util.threading import update_stats_single
 from vcmmd.config import VCMMDConfig
 from vcmmd.cgroup import MemoryCgroup
@@ -38,6 +37,8 @@ from vcmmd.env import Env
 
 class HostStats(Stats):
 
+    __slots__ = ()
+
     ABSOLUTE_STATS = [
         'memtotal',         # total amount of physical memory on host
         'swaptotal',        # total swap size on host
@@ -66,6 +67,8 @@ HostMeta = type("HostMeta", (Singleton, ABCMeta), {})
 class Host(Env, metaclass=HostMeta):
 
     KSM_CONTROL_PATH = '/sys/kernel/mm/ksm/{}'
+    KSM_STATS_KEYS = ('full_scans', 'pages_sharing', 'pages_unshared',
+                      'pages_shared', 'pages_volatile', 'pages_to_scan', 'run')
     THP_CONTROL_PATH = '/sys/kernel/mm/transparent_hugepage/{}'
 
 
@@ -133,11 +136,8 @@ class Host(Env, metaclass=HostMeta):
     def update_stats(self):
         '''Update host stats.
         '''
-        sysfs_keys = ['full_scans', 'pages_sharing', 'pages_unshared',
-                      'pages_shared', 'pages_volatile', 'pages_to_scan', 'run']
-
         ksm_stats = {}
-        for datum in sysfs_keys:
+        for datum in self.KSM_STATS_KEYS:
             name = self.KSM_CONTROL_PATH.format(datum)
             try:
                 with open(name, 'r') as ksm_stats_file:
@@ -147,6 +147,11 @@ class Host(Env, metaclass=HostMeta):
                 self.log_err("Failed to update stat: open %s failed: %s",
                              name, err)
         mem = psutil.virtual_memory()
+        if mem.total != self.total_mem:
+            # Memory was hot(un)plugged, pick up the new size for free as
+            # we have just fetched it anyway.
+            self.total_mem = self.ve_mem = mem.total
+            self.log_info('%d bytes available for VEs', self.ve_mem)
 
         stats = {'memtotal': self.total_mem,
                  'swaptotal': self.get_swap_total(),
@@ -160,7 +165,7 @@ class Host(Env, metaclass=HostMeta):
                  'ksm_pages_to_scan': ksm_stats.get('pages_to_scan', -1),
                  'ksm_run': ksm_stats.get('run', -1),
                  }
-        self.stats._update(**stats)
+        self.stats._update_dict(stats)
 
     def thptune(self, params):
         for key, val in params.items():
@@ -208,19 +213,7 @@ class Host(Env, metaclass=HostMeta):
             self.log_err('Failed to update CPU stats: %s', err)
             return {}
 
-        names = ["cpuuser", "cpunice", "cpusystem", "cpuidle"]
-        cpustats = {}
-        for line in stats:
-            if not re.search("cpu\d+", line):
-                continue
-            res = {}
-            cpu, data = re.split(" ", line, maxsplit = 1)
-            cpu = int(cpu[3:])
-            for name, value in zip(names, re.findall("(\d+)", data)):
-                res[name] = int(value)
-            cpustats[cpu] = res
-
-        return cpustats
+        return parse_cpu_stats(stats)
 
     @staticmethod
     def get_cpu_count():
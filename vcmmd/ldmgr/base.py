@@ -25,7 +25,6 @@ import logging
 import os
 import threading
 import types
-import psutil
 import xml.etree.ElementTree as ET
 
 from vcmmd.error import (VCMMDError,
@@ -36,8 +35,7 @@ from vcmmd.error import (VCMMDError,
                          VCMMD_ERROR_POLICY_SET_ACTIVE_VES,
                          VCMMD_ERROR_VE_OPERATION_FAILED)
 from vcmmd.ve_config import DefaultVEConfig, VEConfig, VCMMD_MEMGUARANTEE_AUTO
-from vcmmd.ve_type import (VE_TYPE_VM, VE_TYPE_VM_LINUX,
-                           VE_TYPE_VM_WINDOWS, VE_TYPE_SERVICE)
+from vcmmd.ve_type import VE_TYPE_VM, VE_TYPE_SERVICE, VE_TYPES_VM
 from vcmmd.ldmgr.policy import clamp
 from vcmmd.util.libvirt import list_active_domains
 from vcmmd.config import VCMMDConfig
@@ -100,7 +98,7 @@ class LoadManager:
         self._initialize_ves()
 
     def _set_user_cache_limit(self):
-        total_mem = psutil.virtual_memory().total
+        total_mem = self._host.total_mem
         cache_limit = self.cfg.get_num(
                 'LoadManager.UserCacheLimitTotal',
                 min(total_mem // 10, 10 * (1 << 30)))
@@ -214,7 +212,7 @@ class LoadManager:
             self._check_guarantees(ve.mem_min)
             ve.effective_limit = min(ve.config.limit, self._host.ve_mem)
 
-            self._registered_ves[ve_name] = ve
+            self._registered_ves[ve.name] = ve
 
             self.logger.info('Registered %s (%s)', ve, ve.config)
 
@@ -237,7 +235,7 @@ class LoadManager:
             if not ve.active:
                 raise VCMMDError(VCMMD_ERROR_VE_NOT_ACTIVE)
 
-            if ve.VE_TYPE in (VE_TYPE_VM, VE_TYPE_VM_LINUX, VE_TYPE_VM_WINDOWS):
+            if ve.VE_TYPE in VE_TYPES_VM:
                 ve._get_obj()._update_cgroups()
 
             ve_config.complete(ve.config)
@@ -406,7 +404,7 @@ class LoadManager:
 
     def _initialize_service(self, name, config):
         known_params = {'Limit', 'Guarantee', 'Swap', 'Path'}
-        total_mem = psutil.virtual_memory().total
+        total_mem = self._host.total_mem
         if 'Path' not in config and name == 'VStorage':
             config['Path'] = 'vstorage.slice/vstorage-services.slice'
             self.logger.info('Assuming that VStorage is located at %s',
@@ -30,10 +30,7 @@ import json
 import vcmmd.util.cpu
 from vcmmd.host import Host
 from vcmmd.config import VCMMDConfig
-from vcmmd.ve_type import (VE_TYPE_SERVICE,
-                           VE_TYPE_VM,
-                           VE_TYPE_VM_LINUX,
-                           VE_TYPE_VM_WINDOWS)
+from vcmmd.ve_type import VE_TYPE_SERVICE, VE_TYPES_VM
 from vcmmd.cgroup import MemoryCgroup
 from vcmmd.util.limits import INT64_MAX
 from vcmmd.util.misc import get_cs_num
@@ -255,7 +252,7 @@ class NumaPolicy(Policy):
                     pass
                 for node in nodes:
                     self.counts['NUMA']['node'][node] += 1
-        self.logger.debug(repr(self.__prev_numa_migrations))
+        self.logger.debug('%r', self.__prev_numa_migrations)
 
     @Policy.controller
     def numa_controller(self):
@@ -314,11 +311,11 @@ class KSMPolicy(Policy):
         self.counts['KSM'] = {'run': 0}
 
     def ve_activated(self, ve):
-        if ve.VE_TYPE in (VE_TYPE_VM, VE_TYPE_VM_LINUX, VE_TYPE_VM_WINDOWS):
+        if ve.VE_TYPE in VE_TYPES_VM:
             self.active_vm += 1
 
     def ve_deactivated(self, ve):
-        if ve.VE_TYPE in (VE_TYPE_VM, VE_TYPE_VM_LINUX, VE_TYPE_VM_WINDOWS):
+        if ve.VE_TYPE in VE_TYPES_VM:
             self.active_vm -= 1
             self.active_vm = max(self.active_vm, 0)
 
@@ -396,7 +393,7 @@ class StoragePolicy(Policy):
             (self._memcgp.write_swappiness, 0, 'swappiness'),
             (self._memcgp.write_oom_control, 1, 'oom_control'),
         ]
-        self.logger.debug('Set cache.limit_in_bytes to %s' % cache_limit)
+        self.logger.debug('Set cache.limit_in_bytes to %s', cache_limit)
         for fn, value, name in update_cgroup_files:
             try:
                 fn(value)
@@ -19,6 +19,8 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
+import functools
+
 from vcmmd.env import Env
 from vcmmd.util.stats import Stats
 from vcmmd.util.misc import parse_range_list
@@ -27,6 +29,8 @@ from vcmmd.util.misc import parse_range_list
 class NumaStats:
 
     class MemStats(Stats):
+        __slots__ = ()
+
         ABSOLUTE_STATS = [
             'memtotal',
             'memusage',
@@ -35,6 +39,8 @@ class NumaStats:
 
 
     class CpuStats(Stats):
+        __slots__ = ()
+
         # TODO move to cumulative
         ABSOLUTE_STATS = [
             'cpuuser',
@@ -49,13 +55,15 @@ class NumaStats:
         self.node_ids = node_ids
 
     def update_memstats(self, memstats):
-        for n in self.node_ids:
-            self.memstats[n]._update(**memstats.get(n, {}))
+        get = memstats.get
+        for n, stats in self.memstats.items():
+            stats._update_dict(get(n, {}))
 
     def update_cpustats(self, cpustats):
-        for n in self.node_ids:
-            for c in self.cpustats[n]:
-                self.cpustats[n][c]._update(**cpustats.get(c, {}))
+        get = cpustats.get
+        for node_cpustats in self.cpustats.values():
+            for c, stats in node_cpustats.items():
+                stats._update_dict(get(c, {}))
 
     def report(self):
         ret = {}
@@ -96,6 +104,7 @@ class Numa:
                     cls.nodes_ids.remove(n)
                     continue
                 cls.cpu_list[n] = cpu_list
+        cls.all_cpus = tuple(c for n in cls.nodes_ids for c in cls.cpu_list[n])
 
         with open(cls.MIN_FREE_PATH) as f:
             min_free_kbytes = int(f.read())
@@ -107,6 +116,12 @@ class Numa:
 
         cls.__inited = True
 
+    @classmethod
+    @functools.lru_cache()
+    def cpus_by_nodes(cls, nodes):
+        """Return frozenset of CPUs of NUMA nodes given as a frozenset."""
+        return frozenset().union(*(cls.cpu_list[n] for n in nodes))
+
     @staticmethod
     def get_nodes_ids():
         with open("/sys/devices/system/node/online") as node_list:
@@ -24,6 +24,7 @@ import os
 import logging
 import libvirt
 from libvirt import libvirtError
+import threading
 import time
 
 from contextlib import suppress
@@ -32,30 +33,81 @@ from contextlib import suppress
 logger = logging.getLogger(__name__)
 
 
+def _run_event_loop():
+    while True:
+        # An exception escaping this thread would bring the whole daemon
+        # down, so just log it and keep serving events.
+        try:
+            libvirt.virEventRunDefaultImpl()
+        except libvirtError as e:
+            logger.error('Failed to run libvirt event loop: %s', e)
+            time.sleep(1)
+
+
+@functools.lru_cache()
+def _start_event_loop():
+    # The event implementation must be registered before opening any
+    # connection, otherwise the connection won't deliver domain events.
+    libvirt.virEventRegisterDefaultImpl()
+    threading.Thread(target=_run_event_loop, name='libvirt-events',
+                     daemon=True).start()
+
+
 class _LibvirtProxy:
 
+    CONNECT_TIMEOUT = 120  # seconds
+    CONNECT_BACKOFF_MIN = 0.01
+    CONNECT_BACKOFF_MAX = 5
+
     def __init__(self, endpoint):
         self.__endpoint = endpoint
         self.__conn = None
+        self.__domain_event_callbacks = []
+        # Bumped on every (re)connect, so that users can tell that objects
+        # obtained from the connection became stale.
+        self.epoch = 0
+        _start_event_loop()
         self.__connect()
 
     def __connect(self):
         if self.__conn:
             with suppress(libvirtError):
                 self.__conn.close()
-        retry_num = 120
-        while retry_num > 0:
+        # Retry quickly first, as libvirtd is usually back in a moment, but
+        # back off exponentially so as not to hammer it while it is down.
+        deadline = time.monotonic() + self.CONNECT_TIMEOUT
+        backoff = self.CONNECT_BACKOFF_MIN
+        while True:
             try:
-                logger.debug(f'libvirtd.open("{self.__endpoint}")')
+                logger.debug('libvirtd.open(%r)', self.__endpoint)
                 self.__conn = libvirt.open(self.__endpoint)
             except libvirtError as e:
                 logger.error('Failed to connect to libvirtd: %s', e)
-                time.sleep(1)
-                retry_num -= 1
+                if time.monotonic() + backoff > deadline:
+                    raise Exception('Failed connect to libvirtd')
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self.CONNECT_BACKOFF_MAX)
             else:
                 break
-        else:
-            raise Exception('Failed connect to libvirtd')
+        self.epoch += 1
+        for event_id, callback in self.__domain_event_callbacks:
+            self.__conn.domainEventRegisterAny(None, event_id, callback, None)
+
+    def register_domain_event(self, event_id, callback):
+        '''Subscribe 'callback' to domain events of type 'event_id'.
+
+        Unlike virConnect.domainEventRegisterAny, the subscription survives
+        reconnects to libvirtd. The callback is called from the libvirt event
+        loop thread.
+        '''
+        self.__domain_event_callbacks.append((event_id, callback))
+        try:
+            self.__conn.domainEventRegisterAny(None, event_id, callback, None)
+        except libvirtError:
+            # Reconnecting registers every known callback, this one included.
+            if not self.__is_connection_error():
+                self.__domain_event_callbacks.remove((event_id, callback))
+                raise
 
     def __is_connection_error(self):
         if self.__conn.isAlive():
@@ -76,6 +128,9 @@ class _LibvirtProxy:
                     return self.__attr(name)(*args, **kwargs)
                 else:
                     raise
+        # Cache the wrapper so that further lookups of this attribute don't
+        # get here and allocate a new one.
+        setattr(self, name, wrapped_attr)
         return wrapped_attr
 
 
@@ -95,15 +150,24 @@ class VirtDomainProxy:
     def __init__(self, uuid, libvirt_proxy=None):
         self.__uuid = uuid
         self.__conn = libvirt_proxy or get_qemu_proxy()
+        self.__lookup_domain()
+
+    def __lookup_domain(self):
+        self.__conn_epoch = self.__conn.epoch
         self.__dom = self.__conn.lookupByUUIDString(self.__uuid)
 
     def __getattr__(self, name):
         def wrapped_attr(*args, **kwargs):
+            # Don't bother calling the domain if the connection it belongs
+            # to has been reestablished since the lookup, it would fail.
+            if self.__conn_epoch != self.__conn.epoch:
+                self.__lookup_domain()
             try:
                 return getattr(self.__dom, name)(*args, **kwargs)
             except libvirtError:
-                self.__dom = self.__conn.lookupByUUIDString(self.__uuid)
+                self.__lookup_domain()
                 return getattr(self.__dom, name)(*args, **kwargs)
+        setattr(self, name, wrapped_attr)
         return wrapped_attr
 
 
@@ -114,5 +178,5 @@ def list_active_domains():
         domains += get_qemu_proxy().listAllDomains(
             libvirt.VIR_CONNECT_LIST_DOMAINS_ACTIVE)
     except LookupError as e:
-        logger.warning(f'{get_qemu_proxy.__name__} failed: {e}')
+        logger.warning('%s failed: %s', get_qemu_proxy.__name__, e)
     return domains
@@ -39,17 +39,24 @@ class LoggerWriter:
     sys.stderr = LoggerWriter(logger, logging.CRITICAL)
     '''
 
+    __slots__ = ('logger', 'level', '_buf')
+
     def __init__(self, logger, level):
         self.logger = logger
         self.level = level
-        self._buf = ''
+        self._buf = []  # pieces of the current incomplete line
 
     def write(self, message):
-        l = message.split('\n')
-        l[0] = self._buf + l[0]
-        for s in l[:-1]:
+        if '\n' not in message:
+            if message:
+                self._buf.append(message)
+            return
+        head, _, tail = message.rpartition('\n')
+        self._buf.append(head)
+        lines = ''.join(self._buf).split('\n')
+        self._buf = [tail] if tail else []
+        for s in lines:
             self.logger.log(self.level, s)
-        self._buf = l[-1]
 
     def flush(self):
         pass
@@ -19,9 +19,9 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
-from itertools import chain
 import json
 import pprint
+import re
 import psutil
 
 
@@ -32,31 +32,74 @@ def print_dict(d, j=False):
 
 
 def roundup(v, t):
-    return v if (v % t) == 0 else v + t - (v % t)
+    if t > 0 and t & (t - 1) == 0:
+        # power of two, which memory sizes usually are
+        return (v + t - 1) & -t
+    r = v % t
+    return v if r == 0 else v + t - r
 
 
 def clamp(v, l, h):
     return max(l, min(v, h))
 
 
+_RANGE_RE = re.compile(r'^\s*(\d+)\s*(?:-\s*(\d+))?\s*$')
+
+
+def _parse_range_bounds(rng):
+    """Return the first and the last integers of range described in input string."""
+    m = _RANGE_RE.match(rng)
+    if not m:
+        raise ValueError("Bad range: '{}'".format(rng))
+    start = int(m.group(1))
+    end = start if m.group(2) is None else int(m.group(2))
+    if start > end:
+        end, start = start, end
+    return start, end
+
+
 def parse_range(rng):
     """Produce list of integers which fall in range described in input string."""
     if not rng or rng.isspace():
         return []
-    parts = rng.split('-')
-    if len(parts) > 2:
-        raise ValueError("Bad range: '{}'".format(rng))
-    parts = [int(i) for i in parts]
-    start = parts[0]
-    end = start if len(parts) == 1 else parts[1]
-    if start > end:
-        end, start = start, end
-    return [i for i in range(start, end + 1)]
+    start, end = _parse_range_bounds(rng)
+    return list(range(start, end + 1))
 
 
 def parse_range_list(rngs):
     """Produce list of integers which fall in comma separated range description."""
-    return sorted(set(chain(*[parse_range(rng) for rng in rngs.split(',')])))
+    # Collect integers as bits of a mask: this merges overlapping ranges
+    # without materializing them, and the bits come out sorted.
+    mask = 0
+    for rng in rngs.split(','):
+        if not rng or rng.isspace():
+            continue
+        start, end = _parse_range_bounds(rng)
+        mask |= (1 << (end + 1)) - (1 << start)
+    ret = []
+    while mask:
+        lowest = mask & -mask
+        ret.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return ret
+
+
+_CPU_STAT_NAMES = ('cpuuser', 'cpunice', 'cpusystem', 'cpuidle')
+
+
+def parse_cpu_stats(lines):
+    """Extract per-CPU times from lines in /proc/stat format."""
+    ret = {}
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        cpu = fields[0]
+        # skip the summary "cpu" line and everything unrelated to CPUs
+        if not cpu.startswith('cpu') or not cpu[3:].isdigit():
+            continue
+        ret[int(cpu[3:])] = dict(zip(_CPU_STAT_NAMES, map(int, fields[1:])))
+    return ret
 
 
 def get_cs_num():
@@ -73,10 +116,32 @@ def get_cs_num():
     return cs_num
 
 
+_qemu_machine_pids = {}  # machine name -> (create time, PID)
+
+
+def forget_qemu_machine_pid(name):
+    """Drop cached PID of a QEMU machine, e.g. because it was stopped."""
+    _qemu_machine_pids.pop(name, None)
+
+
 def lookup_qemu_machine_pid(name):
     """Return PID of a QEMU machine."""
+    # Scanning all processes is expensive, while the PID doesn't change
+    # during the machine's lifetime. Make sure the cached PID hasn't been
+    # reused by another process by checking its creation time.
+    try:
+        create_time, pid = _qemu_machine_pids[name]
+        if psutil.Process(pid).create_time() == create_time:
+            return pid
+    except (KeyError, psutil.NoSuchProcess):
+        pass
+
     procs = []
-    for proc in psutil.process_iter():
+    # The process name is fetched by psutil along with the process itself,
+    # so filter by it first to avoid reading cmdline of every process.
+    for proc in psutil.process_iter(['name']):
+        if proc.info['name'] != 'qemu-kvm':
+            continue
         try:
             cmd = proc.cmdline()
         except psutil.NoSuchProcess:
@@ -90,5 +155,6 @@ def lookup_qemu_machine_pid(name):
                 procs.append((proc.create_time(), proc.pid))
     procs.sort(reverse=True)
     if len(procs) > 0:
+        _qemu_machine_pids[name] = procs[0]
         return procs[0][1]
     raise OSError("No such process: '{}'".format(name))
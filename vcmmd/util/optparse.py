@@ -21,6 +21,17 @@
 
 import copy
 import optparse
+import re
+
+
+# Note: purposely no 'b' suffix, since that makes 0x12b ambiguous.
+_MEMSIZE_RE = re.compile(r'(.+?)([gmk]?)', re.IGNORECASE | re.DOTALL)
+_MEMSIZE_MULTIPLIER = {
+    'g': 1024 * 1024 * 1024,
+    'm': 1024 * 1024,
+    'k': 1024,
+    '': 1,
+}
 
 
 # borrowed from chromium
@@ -28,25 +39,14 @@ class OptionWithMemsize(optparse.Option):
 
     @staticmethod
     def _CheckMemsize(option, opt, value):
-        # Note: purposely no 'b' suffix, since that makes 0x12b ambiguous.
-        multiplier_table = [
-            ('g', 1024 * 1024 * 1024),
-            ('m', 1024 * 1024),
-            ('k', 1024),
-            ('', 1),
-        ]
-        for (suffix, multiplier) in multiplier_table:
-            if value.lower().endswith(suffix):
-                new_value = value
-                if suffix:
-                    new_value = new_value[:-len(suffix)]
-                try:
-                    # Convert w/ base 0 (handles hex, binary, octal, etc)
-                    return int(new_value, 0) * multiplier
-                except ValueError:
-                    # Pass and try other suffixes; not useful now, but may be
-                    # useful later if we ever allow B vs. GB vs. GiB.
-                    pass
+        m = _MEMSIZE_RE.fullmatch(value)
+        if m:
+            num, suffix = m.groups()
+            try:
+                # Convert w/ base 0 (handles hex, binary, octal, etc)
+                return int(num, 0) * _MEMSIZE_MULTIPLIER[suffix.lower()]
+            except ValueError:
+                pass
         raise optparse.OptionValueError("option {}: invalid memsize value: "
                                         "{}".format(opt, value))
 
@@ -28,12 +28,12 @@ class Singleton(type):
         ...
     '''
 
-    _instances = {}
-
     def __call__(cls, *args, **kwargs):
-        try:
-            inst = cls._instances[cls]
-        except KeyError:
+        # The instance is stored in the class itself. Look it up in the class
+        # namespace rather than via attribute lookup, so that a subclass does
+        # not pick up the instance of its base.
+        inst = cls.__dict__.get('_singleton_instance')
+        if inst is None:
             inst = super(Singleton, cls).__call__(*args, **kwargs)
-            cls._instances[cls] = inst
+            cls._singleton_instance = inst
         return inst
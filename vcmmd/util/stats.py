@@ -24,6 +24,9 @@ import time
 
 class Stats:
 
+    __slots__ = ('_Stats__stats', '_Stats__raw_stats', '_Stats__last_update',
+                 'ALL_STATS', 'delta_t')
+
     ABSOLUTE_STATS = []
 
     CUMULATIVE_STATS = []
@@ -44,27 +47,31 @@ class Stats:
         return str(self.__stats)
 
     def _update(self, **stats):
-        prev_stats = self.__raw_stats
+        self._update_dict(stats)
+
+    def _update_dict(self, stats):
+        # Same as _update(), but takes the dict as is instead of having it
+        # rebuilt by keyword argument unpacking. The dict is kept to compute
+        # deltas on the next update, so the caller must not modify it.
+        get = stats.get
+        prev_get = self.__raw_stats.get
         self.__raw_stats = stats
         __stats = {}
 
         for k in self.ABSOLUTE_STATS:
-            v = stats.get(k, -1)
-            if v < 0:  # stat unavailable => return -1
-                v = -1
-            __stats[k] = v
+            v = get(k, -1)
+            # stat unavailable => return -1
+            __stats[k] = v if v >= 0 else -1
 
-        now = time.time()
-        self.delta_t = now - self.__last_update
+        now = time.monotonic()
+        delta_t = self.delta_t = now - self.__last_update
         self.__last_update = now
 
         for k in self.CUMULATIVE_STATS:
-            cur, prev = stats.get(k, -1), prev_stats.get(k, -1)
-            if cur < 0 or prev < 0:  # stat unavailable => return -1
-                delta = -1
-            else:
-                delta = int((cur - prev) / self.delta_t)
-            __stats[k] = delta
+            cur, prev = get(k, -1), prev_get(k, -1)
+            # stat unavailable => return -1
+            __stats[k] = (int((cur - prev) / delta_t)
+                          if cur >= 0 and prev >= 0 else -1)
         # stats update should be thread-safe
         self.__stats = __stats
 
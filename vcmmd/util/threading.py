@@ -19,8 +19,11 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
+import functools
+import os
 import sys
 import threading
+import weakref
 from multiprocessing.pool import ThreadPool
 
 
@@ -52,21 +55,29 @@ def setup_thread_excepthook():
 def update_stats_single(fn):
     """
     Special decorator for update stats methods.
-    Such methods should not be running in parallel for single object
+    Such methods should not be running in parallel for single object.
+    If the stats are being updated right now, the call returns immediately.
     """
-    lock = threading.Lock()
-
-    def wrapped(*args, **kwargs):
-        if lock.locked():
+    # Each object gets its own lock, so that updating stats of one object
+    # doesn't make concurrent updates of other objects a no-op.
+    locks = weakref.WeakKeyDictionary()
+    locks_lock = threading.Lock()
+
+    @functools.wraps(fn)
+    def wrapped(self, *args, **kwargs):
+        lock = locks.get(self)
+        if lock is None:
+            with locks_lock:
+                lock = locks.setdefault(self, threading.Lock())
+        if not lock.acquire(blocking=False):
             # looks like some one update this stats right now,
-            # so let's just wait until it finished.
-            with lock:
-                return
-
-        with lock:
+            # no need to do it once again.
+            return
+        try:
             # update stats methods should not return anything
-            assert not fn(*args, **kwargs)
-    wrapped.__lock = lock
+            assert not fn(self, *args, **kwargs)
+        finally:
+            lock.release()
     return wrapped
 
 
@@ -75,11 +86,16 @@ def update_stats_single(fn):
 # with libvirtd.
 
 # XXX: Note, using threads should not really hurt parallelism, because real
-# work is done from system calls, with GIL released.
+# work is done from system calls, with GIL released. So size the pool like
+# concurrent.futures does for I/O bound work rather than by a small constant,
+# otherwise requests for many VEs get serialized behind each other.
+
+_THREAD_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
 
 def run_async(func, *args, **kwargs):
     if run_async.thread_pool is None:
-        run_async.thread_pool = ThreadPool(3)
+        run_async.thread_pool = ThreadPool(_THREAD_POOL_SIZE)
     return run_async.thread_pool.apply_async(func, args, kwargs)
 
 run_async.thread_pool = None
@@ -19,7 +19,7 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
-import itertools
+import sys
 
 from vcmmd.error import (
     VCMMDError,
@@ -37,9 +37,7 @@ from vcmmd.util.threading import update_stats_single
 from vcmmd.ve_type import (
     get_ve_type_name,
     VE_TYPE_SERVICE,
-    VE_TYPE_VM_LINUX,
-    VE_TYPE_VM_WINDOWS,
-    VE_TYPE_VM,
+    VE_TYPES_VM,
 )
 
 
@@ -49,6 +47,8 @@ class Error(Exception):
 
 class VEStats(Stats):
 
+    __slots__ = ('mem_shared',)
+
     ABSOLUTE_STATS = [
         "rss",          # resident set size
         "actual",       # actual amount of memory committed to the guest
@@ -73,6 +73,15 @@ class VEStats(Stats):
         "wr_bytes",  # number of written bytes
     ]
 
+    def __init__(self):
+        super(VEStats, self).__init__()
+        self.mem_shared = 0
+
+    def _update_dict(self, stats):
+        super(VEStats, self)._update_dict(stats)
+        # Policies query this for every VE, derive it once per update.
+        self.mem_shared = max(0, self.rss - self.host_mem)
+
 
 class VEImpl:
     """VE implementation.
@@ -140,24 +149,35 @@ class VEImpl:
         pass
 
 
-_VE_IMPL_MAP = {}  # VE type -> VE implementation class
+# VE implementation classes indexed by VE type (VE types are small ints)
+_VE_IMPL_LIST = []
 
 
 def register_ve_impl(ve_impl):
-    assert ve_impl.VE_TYPE not in _VE_IMPL_MAP
-    _VE_IMPL_MAP[ve_impl.VE_TYPE] = ve_impl
+    ve_type = ve_impl.VE_TYPE
+    if ve_type >= len(_VE_IMPL_LIST):
+        _VE_IMPL_LIST.extend([None] * (ve_type + 1 - len(_VE_IMPL_LIST)))
+    assert _VE_IMPL_LIST[ve_type] is None
+    _VE_IMPL_LIST[ve_type] = ve_impl
 
 
 def _lookup_ve_impl(ve_type):
-    try:
-        return _VE_IMPL_MAP[ve_type]
-    except KeyError:
-        raise VCMMDError(VCMMD_ERROR_INVALID_VE_TYPE)
+    # negative indices would wrap around, reject them explicitly
+    if isinstance(ve_type, int) and 0 <= ve_type < len(_VE_IMPL_LIST):
+        ve_impl = _VE_IMPL_LIST[ve_type]
+        if ve_impl is not None:
+            return ve_impl
+    raise VCMMDError(VCMMD_ERROR_INVALID_VE_TYPE)
+
+
+_STATS_ERRORS = (Error, IOError)
 
 
 def _check_ve_name(name):
     if not name:
         raise VCMMDError(VCMMD_ERROR_INVALID_VE_NAME)
+    # VE names are used as keys by the load manager and policies
+    return sys.intern(str(name))
 
 
 def _check_ve_config(config):
@@ -173,18 +193,21 @@ class VE(Env):
 
     def __init__(self, ve_type, name, config):
         super(VE, self).__init__("vcmmd.ve")
-        _check_ve_name(name)
+        name = _check_ve_name(name)
         _check_ve_config(config)
 
         self._impl = _lookup_ve_impl(ve_type)
         self._obj = None
+        self.VE_TYPE = self._impl.VE_TYPE
 
         self.name = name
+        self._str = "{} '{}'".format(get_ve_type_name(self.VE_TYPE), name)
         self.config = config
         self.stats = VEStats()
         self.numa = VE.Numa(self)
         self.active = False
         self._overhead = self._impl.mem_overhead(config.limit)
+        self._cache_config_values(config)
 
         # Instantiate service as soon as possible in order to
         # gently prevent registering of not existing service.
@@ -192,16 +215,15 @@ class VE(Env):
             self._get_obj()
 
     def __str__(self):
-        return "{} '{}'".format(get_ve_type_name(self.VE_TYPE), self.name)
-
-    @property
-    def VE_TYPE(self):
-        return self._impl.VE_TYPE
+        return self._str
 
     def _get_obj(self):
         if self._obj is None:
             obj = self._impl(self.name)
             self._obj = obj
+            # The object is never replaced once created, so shadow this
+            # method with a plain getter for all subsequent calls.
+            self._get_obj = lambda: obj
             self.set_config(self.config)
         return self._obj
 
@@ -231,42 +253,47 @@ class VE(Env):
         self.log_info("Deactivated")
 
     def get_numa_stats(self):
+        if not self.active:
+            self.log_err("Failed to update numa stats: VE is not activated")
+            return {}
         try:
-            if not self.active:
-                raise Error("VE is not activated")
-
             cg = self._get_obj()._memcg
             return cg.get_numa_stats()
-        except (Error, IOError) as err:
+        except _STATS_ERRORS as err:
             self.log_err("Failed to update numa stats: %s", err)
         return {}
 
     def get_cpu_stats(self):
+        if not self.active:
+            self.log_err("Failed to update CPU stats: VE is not activated")
+            return {}
         try:
-            if not self.active:
-                raise Error("VE is not activated")
-
             cg = self._get_obj()._cpucg
             return cg.get_cpu_stats()
-        except (Error, IOError) as err:
+        except _STATS_ERRORS as err:
             self.log_err("Failed to update CPU stats: %s", err)
         return {}
 
     @update_stats_single
     def update_stats(self):
         """Update VE stats."""
+        if not self.active:
+            self.log_err("Failed to update stats: VE is not activated")
+            return
         try:
-            if not self.active:
-                raise Error("VE is not activated")
-
             obj = self._get_obj()
-            self.stats._update(**obj.get_stats())
+            self.stats._update_dict(obj.get_stats())
         except Error as err:
             self.log_err("Failed to update stats: %s", err)
 
+    def _cache_config_values(self, config):
+        # Policies query these for every VE on each pass.
+        self._mem_overhead = self._overhead + config.vram
+        self._mem_min_base = config.mem_min + self._overhead
+
     @property
     def mem_overhead(self):
-        return self._overhead + self.config.vram
+        return self._mem_overhead
 
     @property
     def mem_min(self):
@@ -276,32 +303,34 @@ class VE(Env):
         However, for an inactive VE the result will never be less than RSS,
         because its allocation cannot be tuned anymore.
         """
-        val = self.config.mem_min + self._overhead
-        if not (self._impl.VE_TYPE == VE_TYPE_SERVICE or self.active):
+        val = self._mem_min_base
+        if not (self.VE_TYPE == VE_TYPE_SERVICE or self.active):
             val = max(val, self.get_rss(verbose=False))
         return val
 
     @property
     def mem_shared(self):
-        return max(0, self.stats.rss - self.stats.host_mem)
+        return self.stats.mem_shared
 
     def apply_limit_settings(self):
         """Set VE memory consumption according to VE's configuration."""
-        msg = ""
+        target = None
         try:
             obj = self._get_obj()
-            vm_types = (VE_TYPE_VM_LINUX, VE_TYPE_VM_WINDOWS, VE_TYPE_VM)
             # Don't set target memory for VM's because libvirt manages it
-            if self.config.limit and obj.VE_TYPE not in vm_types:
-                obj.set_mem_target(self.config.limit)
-                msg = "target:{} ".format(self.config.limit)
-            obj.set_mem_protection(self.mem_min)
-            msg += "protection:{}".format(self.mem_min)
+            if self.config.limit and obj.VE_TYPE not in VE_TYPES_VM:
+                target = self.config.limit
+                obj.set_mem_target(target)
+            protection = self.mem_min
+            obj.set_mem_protection(protection)
         except Error as err:
             self.log_err("Failed to tune allocation: %s", err)
         else:
-            if msg:
-                self.log_debug("set_mem: %s", msg)
+            if target is not None:
+                self.log_debug("set_mem: target:%s protection:%s",
+                               target, protection)
+            else:
+                self.log_debug("set_mem: protection:%s", protection)
 
     def set_config(self, config):
         """Update VE config."""
@@ -312,10 +341,12 @@ class VE(Env):
             if obj.VE_TYPE != VE_TYPE_SERVICE:
                 config.update(cpunum=obj.nr_cpus)
             self.config = config
+            self._cache_config_values(config)
             obj.set_config(config)
         except Error as err:
-            self.log_err(f"Failed to set config: {err}")
+            self.log_err("Failed to set config: %s", err)
             self.config = old_config
+            self._cache_config_values(old_config)
             obj.set_config(old_config)
             raise VCMMDError(VCMMD_ERROR_VE_OPERATION_FAILED)
 
@@ -329,15 +360,13 @@ class VE(Env):
                 if obj.VE_TYPE != VE_TYPE_SERVICE:
                     config.update(cpunum=obj.nr_cpus)
         except Error as err:
-            self.log_err(f"Failed to get config {err}")
+            self.log_err("Failed to get config %s", err)
             raise VCMMDError(VCMMD_ERROR_INVALID_VE_CONFIG)
         return config
 
     def set_node_list(self, nodes):
         """Set VE NUMA binding."""
-        cpus = set()
-        for n in nodes:
-            cpus.update(self.numa.cpu_list[n])
+        cpus = self.numa.cpus_by_nodes(frozenset(nodes))
         self.pin_node_mem(nodes)
         self.pin_cpu_list(cpus)
 
@@ -366,12 +395,12 @@ class VE(Env):
         except Error as err:
             self.log_err("Failed to bind CPU list: %s", err)
         else:
-            self.log_debug("pin_cpu_list: %s", [*cpus])
+            self.log_debug("pin_cpu_list: %s", cpus)
 
     def reset_numa_settings(self):
         """Reset all NUMA-related bindings"""
         self.pin_node_mem(self.numa.nodes_ids, migrate=False)
-        self.pin_cpu_list(itertools.chain(*self.numa.cpu_list.values()))
+        self.pin_cpu_list(self.numa.all_cpus)
 
     def numa_enforce_settings(self):
         if self.numa_configured():
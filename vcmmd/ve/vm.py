@@ -19,6 +19,7 @@
 # Our contact details: Virtuozzo International GmbH, Vordergasse 59, 8200
 # Schaffhausen, Switzerland.
 
+import functools
 import logging
 import psutil
 from libvirt import libvirtError
@@ -29,6 +30,10 @@ from libvirt import (
 )
 from libvirt import VIR_DOMAIN_NUMATUNE_MEM_STRICT as NUMATUNE_MEM_STRICT
 from libvirt import VIR_DOMAIN_AFFECT_LIVE as AFFECT_LIVE
+from libvirt import (
+    VIR_DOMAIN_EVENT_ID_LIFECYCLE as EVENT_ID_LIFECYCLE,
+    VIR_DOMAIN_EVENT_STOPPED as EVENT_STOPPED,
+)
 
 from vcmmd.cgroup import MemoryCgroup, CpuSetCgroup, CpuCgroup, pid_cgroup
 from vcmmd.error import VCMMDError, VCMMD_ERROR_VE_OPERATION_FAILED
@@ -36,7 +41,11 @@ from vcmmd.ve.base import Error, VEImpl, register_ve_impl
 from vcmmd.ve_type import VE_TYPE_VM, VE_TYPE_VM_LINUX, VE_TYPE_VM_WINDOWS
 from vcmmd.config import VCMMDConfig
 from vcmmd.util.libvirt import VirtDomainProxy, get_qemu_proxy
-from vcmmd.util.misc import roundup, lookup_qemu_machine_pid
+from vcmmd.util.misc import (
+    roundup,
+    lookup_qemu_machine_pid,
+    forget_qemu_machine_pid,
+)
 
 from vcmmd.util.limits import PAGE_SIZE, INT64_MAX
 from vcmmd.util.misc import parse_range_list
@@ -46,6 +55,28 @@ from vcmmd.util.threading import run_async
 VM_DEFAULT_CACHE_LIMIT_MB = 512
 logger = logging.getLogger(__name__)
 
+_BLOCK_STATS = ("rd.reqs", "rd.bytes", "wr.reqs", "wr.bytes")
+
+
+@functools.lru_cache()
+def _block_stat_keys(count):
+    """Return (stat, libvirt keys of this stat for all block devices) pairs.
+
+    The keys only depend on the number of block devices, so build them once
+    instead of formatting them on every stats poll.
+    """
+    return tuple(
+        (s, tuple("block.{}.{}".format(c, s) for c in range(count)))
+        for s in _BLOCK_STATS
+    )
+
+
+@functools.lru_cache()
+def _watch_domain_lifecycle():
+    get_qemu_proxy().register_domain_event(
+        EVENT_ID_LIFECYCLE, VMImpl._on_domain_lifecycle
+    )
+
 
 class VMImpl(VEImpl):
 
@@ -54,14 +85,28 @@ class VMImpl(VEImpl):
 
     def __init__(self, name):
         try:
+            _watch_domain_lifecycle()
             self._libvirt_domain = VirtDomainProxy(name)
         except libvirtError as err:
             raise Error("Failed to lookup libvirt domain: {}".format(err))
 
         self.pid = -1
+        self.__memstats_update_period = None
+        self.__nr_cpus_stale = True
         self._update_cgroups()
 
+    @staticmethod
+    def _on_domain_lifecycle(conn, dom, event, detail, opaque):
+        # Drop whatever we know about a stopped domain so that it is not
+        # served stale data should it be started again.
+        if event == EVENT_STOPPED:
+            VMImpl.__cached_stats.pop(dom.name(), None)
+            forget_qemu_machine_pid(dom.name())
+
     def _update_cgroups(self):
+        # This is called on VM config updates, which is also how we learn
+        # about vCPU hotplug.
+        self.__nr_cpus_stale = True
         try:
             pid = lookup_qemu_machine_pid(self._libvirt_domain.name())
         except EnvironmentError as err:
@@ -70,6 +115,8 @@ class VMImpl(VEImpl):
         if self.pid == pid:
             return
         self.pid = pid
+        # a new QEMU process starts with the default stats period
+        self.__memstats_update_period = None
 
         # libvirt places every virtual machine in its own cgroup
         try:
@@ -115,6 +162,8 @@ class VMImpl(VEImpl):
             raise Error(str(err))
 
     def set_memstats_period(self, period):
+        if period == self.__memstats_update_period:
+            return
         try:
             self._libvirt_domain.setMemoryStatsPeriod(period)
             self.__memstats_update_period = period
@@ -137,7 +186,6 @@ class VMImpl(VEImpl):
         return config_overhead + guest_mem_overhead
 
     def get_stats(self):
-        self.set_memstats_period(2)
         try:
             name = self._libvirt_domain.name()
             if name not in VMImpl.__cached_stats:
@@ -148,17 +196,12 @@ class VMImpl(VEImpl):
                         STATS_BLOCK | STATS_BALLOON, GET_ALL_RUNNING
                     )
                 }
-            stats = VMImpl.__cached_stats.pop(name, {})
+            stats = VMImpl.__cached_stats.pop(name, None)
         except libvirtError as err:
             raise Error(
                 "Failed to retrieve libvirt domain stats: {}".format(err)
             )
 
-        memstats = {
-            k.split(".")[1]: v
-            for k, v in stats.items()
-            if k.startswith("balloon")
-        }
         try:
             memcg_stat = self._memcg.read_mem_stat()
         except IOError as err:
@@ -172,10 +215,24 @@ class VMImpl(VEImpl):
 
         host_swap = memcg_stat.get("swap", -1)
 
-        blk_stat = {"rd.reqs": 0, "rd.bytes": 0, "wr.reqs": 0, "wr.bytes": 0}
-        for s in blk_stat:
-            for c in range(0, stats.get("block.count", 0)):
-                blk_stat[s] += stats.get("block.{}.{}".format(c, s), 0)
+        # Only running domains are reported. There is nothing to ask QEMU
+        # about if the domain is not running (e.g. paused), so report only
+        # what the cgroup knows and leave the rest unavailable.
+        if stats is None:
+            return {"host_mem": host_mem, "host_swap": host_swap}
+
+        self.set_memstats_period(2)
+
+        memstats = {
+            k.split(".")[1]: v
+            for k, v in stats.items()
+            if k.startswith("balloon")
+        }
+
+        blk_stat = {
+            s: sum(stats.get(k, 0) for k in keys)
+            for s, keys in _block_stat_keys(stats.get("block.count", 0))
+        }
 
         # libvirt reports memory values in kB, so we need to convert them to
         # bytes
@@ -331,11 +388,15 @@ class VMImpl(VEImpl):
 
     @property
     def nr_cpus(self):
-        try:
-            self._nr_cpus = self._libvirt_domain.vcpusFlags(AFFECT_LIVE)
-            return self._nr_cpus
-        except libvirtError:
-            return getattr(self, "_nr_cpus", -1)
+        # Every pin operation iterates over vCPUs, don't query libvirt for
+        # their number each time.
+        if self.__nr_cpus_stale:
+            try:
+                self._nr_cpus = self._libvirt_domain.vcpusFlags(AFFECT_LIVE)
+                self.__nr_cpus_stale = False
+            except libvirtError:
+                pass
+        return getattr(self, "_nr_cpus", -1)
 
 
 class VMLinImpl(VMImpl):
@@ -349,7 +410,7 @@ class VMWinImpl(VMImpl):
 
     def get_stats(self):
         stats = super(VMWinImpl, self).get_stats()
-        if stats["memavail"] < 0:
+        if "memavail" in stats and stats["memavail"] < 0:
             stats["memavail"] = stats["memfree"]
         return stats
 
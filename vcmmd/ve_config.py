@@ -35,6 +35,8 @@ _VEConfigFields = [    # tag
     "cpunum",          # 8
 ]
 
+_VEConfigFields_set = frozenset(_VEConfigFields)
+
 _VEConfigFields_string = [
     "nodelist",  # 4
     "cpulist",   # 5
@@ -100,8 +102,12 @@ class VEConfig:
     libvcmmd should be updated as well while adding new fields.
     """
 
+    __slots__ = ('_kv', '_valid', '_str')
+
     def __init__(self, **kv):
         self._kv = {}
+        self._valid = None  # is_valid() result, None if to be (re)computed
+        self._str = None  # __str__() result, None if to be (re)computed
         for k, v in kv.items():
             if k not in _VEConfigFields:
                 raise TypeError("unexpected keyword argument '{}'".format(k))
@@ -124,11 +130,13 @@ class VEConfig:
             raise AttributeError
 
     def __str__(self):
-        return " ".join(
-            "{}:{}".format(k, self._kv[k])
-            for k in _VEConfigFields
-            if k in self._kv
-        )
+        if self._str is None:
+            self._str = " ".join(
+                "{}:{}".format(k, self._kv[k])
+                for k in _VEConfigFields
+                if k in self._kv
+            )
+        return self._str
 
     @property
     def mem_min(self):
@@ -139,16 +147,20 @@ class VEConfig:
         """Check that the config has all fields initialized and its values pass
         all sanity checks.
         """
-        return (
-            set(self._kv) == set(_VEConfigFields)
-            and self.guarantee <= self.limit
-        )
+        if self._valid is None:
+            self._valid = (
+                self._kv.keys() == _VEConfigFields_set
+                and self.guarantee <= self.limit
+            )
+        return self._valid
 
     def complete(self, config):
         """Initialize absent fields with values from a given config."""
         for k, v in config._kv.items():
             if k not in self._kv:
                 self._kv[k] = v
+        self._valid = None
+        self._str = None
 
     def as_array(self):
         """Convert to an array of (tag, value, string) turples."""
@@ -189,6 +201,8 @@ class VEConfig:
     def update(self, **kwargs):
         for key, value in kwargs.items():
             self._kv[key] = value
+        self._valid = None
+        self._str = None
 
 
 DefaultVEConfig = VEConfig(
@@ -25,6 +25,8 @@ VE_TYPE_VM_LINUX = 2
 VE_TYPE_VM_WINDOWS = 3
 VE_TYPE_SERVICE = 4
 
+VE_TYPES_VM = frozenset((VE_TYPE_VM, VE_TYPE_VM_LINUX, VE_TYPE_VM_WINDOWS))
+
 _TYPE_NAME = {
     VE_TYPE_NONE: 'NONE',
     VE_TYPE_VM: 'VM',